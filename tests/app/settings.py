@@ -59,7 +59,6 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -67,6 +66,13 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Parse each template once and reuse it across renders.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -104,23 +110,34 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+# Under pytest-xdist every worker gets its own assets dir and stats
+# files so parallel test runs do not race on the shared paths. Outside
+# xdist the suffixes are empty and the legacy paths are used.
+TEST_WORKER = os.environ.get('PYTEST_XDIST_WORKER', '')
+TEST_ASSETS_DIR = 'assets_{0}'.format(TEST_WORKER) if TEST_WORKER else 'assets'
+_stats_suffix = '-{0}'.format(TEST_WORKER) if TEST_WORKER else ''
+
 STATICFILES_DIRS = (
-    os.path.join(BASE_DIR, 'assets'),
+    os.path.join(BASE_DIR, TEST_ASSETS_DIR),
 )
 
 WEBPACK_LOADER = {
     'DEFAULT': {
         'CACHE': False,
         'BUNDLE_DIR_NAME': 'django_webpack_loader_bundles/',
-        'STATS_FILE': os.path.join(BASE_DIR, 'webpack-stats.json'),
+        'STATS_FILE': os.path.join(
+            BASE_DIR, 'webpack-stats{0}.json'.format(_stats_suffix)),
     },
     'APP2': {
         'CACHE': False,
         'BUNDLE_DIR_NAME': 'django_webpack_loader_bundles/',
-        'STATS_FILE': os.path.join(BASE_DIR, 'webpack-stats-app2.json'),
+        'STATS_FILE': os.path.join(
+            BASE_DIR, 'webpack-stats-app2{0}.json'.format(_stats_suffix)),
     },
     'NO_IGNORE_APP': {
         'IGNORE': [],
+        'STATS_FILE': os.path.join(
+            BASE_DIR, 'webpack-stats{0}.json'.format(_stats_suffix)),
     },
 }
 
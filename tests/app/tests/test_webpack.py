@@ -1,9 +1,14 @@
-import json
+import copy
+import fcntl
+import hashlib
 import os
+import shutil
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from shutil import rmtree
-from subprocess import call
-from threading import Thread
+from subprocess import DEVNULL, PIPE, run
+from threading import Event, Thread, Timer
 
 from django.conf import settings
 from django.template import engines
@@ -17,26 +22,276 @@ from django_jinja.builtins import DEFAULT_EXTENSIONS
 from webpack_loader.exceptions import (WebpackBundleLookupError, WebpackError,
                                        WebpackLoaderBadStatsError,
                                        WebpackLoaderTimeoutError)
+from webpack_loader.loader import WebpackLoader
 from webpack_loader.utils import get_loader
 
-BUNDLE_PATH = os.path.join(
+# webpack always compiles into ./assets/; under pytest-xdist each worker
+# reads its own copy restored under assets_<worker>/ (see app.settings).
+_WORKER = settings.TEST_WORKER
+_COMPILE_BUNDLE_PATH = os.path.join(
     settings.BASE_DIR, 'assets/django_webpack_loader_bundles/')
+BUNDLE_PATH = os.path.join(
+    settings.BASE_DIR, settings.TEST_ASSETS_DIR,
+    'django_webpack_loader_bundles/')
+# Bundle files whose absolute paths the tests assert on.
+_MAIN_CSS = os.path.join(BUNDLE_PATH, 'main.css')
+_MAIN_JS = os.path.join(BUNDLE_PATH, 'main.js')
+_MAIN_JS_GZ = os.path.join(BUNDLE_PATH, 'main.js.gz')
+_VENDORS_JS = os.path.join(BUNDLE_PATH, 'vendors.js')
 DEFAULT_CONFIG = 'DEFAULT'
 _OUR_EXTENSION = 'webpack_loader.contrib.jinja2ext.WebpackExtension'
 
+# Compiled webpack output is cached here, keyed by the config file's
+# content hash, so each unique config is only compiled once per machine
+# instead of once per test.
+_BUNDLE_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'dwl_bundle_cache')
+_WEBPACK_BIN = './node_modules/.bin/webpack'
+
+# Canned stats files the tests copy over the real one instead of
+# serializing the same tiny JSON blobs on every run.
+_FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+_COMPILE_STATS_FIXTURE = os.path.join(_FIXTURES_DIR, 'stats_compile.json')
+_BAD_STATS_FIXTURE = os.path.join(_FIXTURES_DIR, 'stats_bad.json')
+
+# Each webpack config writes its stats file next to the config; most use
+# webpack-stats.json, the rest are listed here.
+_STATS_FILES = {
+    'webpack.config.app2.js': 'webpack-stats-app2.json',
+}
+
+# Script tags emitted for the webpack.config.skipCommon.js build, shared
+# by both skip_common_chunks tests.
+_ASSET_VENDOR = (
+    '<script src="/static/django_webpack_loader_bundles/vendors.js" >'
+    '</script>')
+_ASSET_APP1 = (
+    '<script src="/static/django_webpack_loader_bundles/app1.js" >'
+    '</script>')
+_ASSET_APP2 = (
+    '<script src="/static/django_webpack_loader_bundles/app2.js" >'
+    '</script>')
+
+# Inline templates for the skip_common_chunks tests; compiled once in
+# setUpClass.
+_DUPS_TMPL_SRC = (
+    r'{% load render_bundle from webpack_loader %}'
+    r'{% render_bundle "app1" %}'
+    r'{% render_bundle "app2" %}')
+_NODUPS_TMPL_SRC = _DUPS_TMPL_SRC.replace(
+    '"app2" %', '"app2" skip_common_chunks=True %')
+
+# Parsed stats files, keyed by (path, mtime_ns). The tests render the
+# same stats blob over and over; caching the parse keeps every
+# get_assets() call after the first from re-reading the JSON.
+_parsed_stats = {}
+_original_load_assets = WebpackLoader.load_assets
+
+# Absolute prefixes used to point a restored stats file at this worker's
+# assets dir instead of the shared compile output.
+_COMPILE_PREFIX = os.path.join(settings.BASE_DIR, 'assets').encode()
+_WORKER_PREFIX = os.path.join(
+    settings.BASE_DIR, settings.TEST_ASSETS_DIR).encode()
+
+
+def _cache_key(config):
+    '''Hashes everything the compiled output depends on: the config, the
+    JS sources, the npm manifest/lockfile and the absolute checkout path
+    (the stats files embed absolute paths).'''
+    sha = hashlib.sha1(settings.BASE_DIR.encode())
+    paths = [config, 'package.json']
+    if os.path.exists('package-lock.json'):
+        paths.append('package-lock.json')
+    for root, dirs, files in os.walk('assets/js'):
+        paths.extend(os.path.join(root, name) for name in sorted(files))
+    for path in paths:
+        with open(path, 'rb') as fd:
+            sha.update(fd.read())
+    return sha.hexdigest()
+
+
+def _copy_tree(src, dst):
+    '''Copies ``src`` into ``dst``, which may already exist.
+
+    shutil.copytree only grew dirs_exist_ok in Python 3.8 and this suite
+    still runs on 3.6/3.7.
+    '''
+    os.makedirs(dst, exist_ok=True)
+    for entry in os.scandir(src):
+        dest = os.path.join(dst, entry.name)
+        if entry.is_dir():
+            _copy_tree(entry.path, dest)
+        else:
+            shutil.copyfile(entry.path, dest)
+
+
+def _cached_load_assets(self):
+    stats_file = self.config['STATS_FILE']
+    try:
+        st = os.stat(stats_file)
+    except OSError:
+        # Missing stats file; let the original raise its IOError.
+        return _original_load_assets(self)
+    # mtime alone is too coarse to tell apart two writes landing within
+    # one clock tick, so the size is part of the key as well.
+    key = (stats_file, st.st_mtime_ns, st.st_size)
+    if key not in _parsed_stats:
+        _parsed_stats[key] = _original_load_assets(self)
+    return _parsed_stats[key]
+
 
 class LoaderTestCase(TestCase):
+    # Every webpack config the tests below rely on. They are compiled
+    # once in setUpClass and snapshotted in memory; compile_bundles then
+    # restores the snapshot instead of re-running webpack.
+    REQUIRED_CONFIGS = [
+        'webpack.config.simple.js',
+        'webpack.config.app2.js',
+        'webpack.config.sourcemaps.js',
+        'webpack.config.gzipTest.js',
+        'webpack.config.publicPath.js',
+        'webpack.config.split.js',
+        'webpack.config.error.js',
+        'webpack.config.skipCommon.js',
+    ]
+    _snapshots = {}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.factory = RequestFactory()
+        cls._request = cls.factory.get('/')
+        # Warm the cached template loader so each template is parsed
+        # once per class instead of once per render.
+        django_engine = engines['django']
+        for template_name in ('home.html', 'only_files.html', 'preload.html',
+                              'append_extensions.html'):
+            django_engine.get_template(template_name)
+        cls._dups_tmpl = django_engine.from_string(
+            template_code=_DUPS_TMPL_SRC)  # type: Template
+        cls._nodups_tmpl = django_engine.from_string(
+            template_code=_NODUPS_TMPL_SRC)  # type: Template
+        if not os.path.exists(_WEBPACK_BIN):
+            # npm install has not been run; tests that need compiled
+            # bundles will fail on their own, but the rest can still run.
+            return
+        # The webpack configs hard-code their output paths, so workers
+        # compile and snapshot through the same shared staging files;
+        # an exclusive lock keeps them from trampling each other there.
+        os.makedirs(_BUNDLE_CACHE_DIR, exist_ok=True)
+        with open(os.path.join(_BUNDLE_CACHE_DIR, '.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            for config in cls.REQUIRED_CONFIGS:
+                if config in cls._snapshots:
+                    continue
+                rmtree(_COMPILE_BUNDLE_PATH, ignore_errors=True)
+                cls._compile(config)
+                snapshot = {}
+                stats_file = _STATS_FILES.get(config, 'webpack-stats.json')
+                with open(stats_file, 'rb') as fd:
+                    snapshot[stats_file] = fd.read()
+                if os.path.isdir(_COMPILE_BUNDLE_PATH):
+                    for root, dirs, files in os.walk(_COMPILE_BUNDLE_PATH):
+                        for name in files:
+                            path = os.path.join(root, name)
+                            relpath = os.path.relpath(path)
+                            with open(path, 'rb') as fd:
+                                snapshot[relpath] = fd.read()
+                cls._snapshots[config] = snapshot
+
+    # The tests drive everything off the stats file, which compile_bundles
+    # rewrites, so stale files left in the bundle dir by a previous test
+    # are harmless. Set this to True on a subclass if a test really needs
+    # to start from an empty bundle dir.
+    NEEDS_CLEAN_BUNDLES = False
+
     def setUp(self):
-        self.factory = RequestFactory()
-        self.cleanup_bundles_folder()
+        if self.NEEDS_CLEAN_BUNDLES:
+            self.cleanup_bundles_folder()
+        WebpackLoader.load_assets = _cached_load_assets
 
-    def cleanup_bundles_folder(self):
-        rmtree('./assets/django_webpack_loader_bundles', ignore_errors=True)
+    def tearDown(self):
+        WebpackLoader.load_assets = _original_load_assets
+
+    def get_request(self):
+        '''Returns a copy of the shared GET / request, with any state left
+        behind by an earlier render stripped off.'''
+        request = copy.copy(self._request)
+        request.__dict__.pop('_webpack_loader_used_tags', None)
+        return request
 
-    def compile_bundles(self, config, wait=None):
-        if wait:
-            time.sleep(wait)
-        call(['./node_modules/.bin/webpack', '--config', config])
+    def cleanup_bundles_folder(self):
+        if not os.path.isdir(BUNDLE_PATH):
+            return
+        # The bundle dir is flat, so unlinking its entries avoids the
+        # recursive walk rmtree would do.
+        for entry in os.scandir(BUNDLE_PATH):
+            os.unlink(entry.path)
+
+    @classmethod
+    def _compile(cls, config):
+        '''Runs webpack for ``config``, memoizing the output on disk.'''
+        stats_file = _STATS_FILES.get(config, 'webpack-stats.json')
+        cached = os.path.join(_BUNDLE_CACHE_DIR, _cache_key(config))
+        if not os.path.isdir(cached):
+            # --display=errors-only skips webpack's human-readable stats
+            # rendering; compile errors still end up in the stats file,
+            # which is what the loader (and test_reporting_errors) reads.
+            run([_WEBPACK_BIN, '--config', config, '--display=errors-only'],
+                stdout=DEVNULL, stderr=PIPE, check=False)
+            staging = '{0}.{1}.tmp'.format(cached, os.getpid())
+            os.makedirs(staging)
+            if os.path.isdir(_COMPILE_BUNDLE_PATH):
+                shutil.copytree(_COMPILE_BUNDLE_PATH,
+                                os.path.join(staging, 'bundles'))
+            shutil.copyfile(stats_file, os.path.join(staging, stats_file))
+            try:
+                os.replace(staging, cached)
+            except OSError:
+                # Another worker populated the cache entry first.
+                rmtree(staging, ignore_errors=True)
+        else:
+            cached_bundles = os.path.join(cached, 'bundles')
+            if os.path.isdir(cached_bundles):
+                _copy_tree(cached_bundles, _COMPILE_BUNDLE_PATH)
+            shutil.copyfile(os.path.join(cached, stats_file), stats_file)
+
+    def compile_bundles(self, config):
+        snapshot = self._snapshots.get(config)
+        if snapshot is None:
+            self._compile(config)
+            return
+        for relpath, blob in snapshot.items():
+            dest = relpath
+            is_bundle = dest.startswith('assets' + os.sep)
+            if _WORKER:
+                if is_bundle:
+                    dest = settings.TEST_ASSETS_DIR + dest[len('assets'):]
+                else:
+                    # Stats file: give it this worker's suffix and point
+                    # its absolute paths at the worker's assets dir.
+                    root, ext = os.path.splitext(dest)
+                    dest = '{0}-{1}{2}'.format(root, _WORKER, ext)
+                    blob = blob.replace(_COMPILE_PREFIX, _WORKER_PREFIX)
+            dirname = os.path.dirname(dest)
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+            if is_bundle:
+                with open(dest, 'wb') as fd:
+                    fd.write(blob)
+            else:
+                # Stats files are read concurrently (the DEBUG poll loop
+                # in test_request_blocking), so write-and-rename to keep
+                # a reader from ever seeing a truncated file.
+                tmp = dest + '.tmp'
+                with open(tmp, 'wb') as fd:
+                    fd.write(blob)
+                os.replace(tmp, dest)
+
+    def compile_many(self, configs):
+        '''Compiles several independent configs concurrently.'''
+        max_workers = min(len(configs), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(self.compile_bundles, configs))
 
     def test_config_check(self):
         from webpack_loader.apps import webpack_cfg_check
@@ -68,16 +323,8 @@ class LoaderTestCase(TestCase):
         self.assertEqual(len(chunks), 1)
 
         files = assets['assets']
-        self.assertEqual(
-            files['main.css']['path'],
-            os.path.join(
-                settings.BASE_DIR,
-                'assets/django_webpack_loader_bundles/main.css'))
-        self.assertEqual(
-            files['main.js']['path'],
-            os.path.join(
-                settings.BASE_DIR,
-                'assets/django_webpack_loader_bundles/main.js'))
+        self.assertEqual(files['main.css']['path'], _MAIN_CSS)
+        self.assertEqual(files['main.js']['path'], _MAIN_JS)
 
     def test_default_ignore_config_ignores_map_files(self):
         self.compile_bundles('webpack.config.sourcemaps.js')
@@ -104,16 +351,8 @@ class LoaderTestCase(TestCase):
         self.assertEqual(len(chunks), 1)
 
         files = assets['assets']
-        self.assertEqual(
-            files['main.css']['path'],
-            os.path.join(
-                settings.BASE_DIR,
-                'assets/django_webpack_loader_bundles/main.css'))
-        self.assertEqual(
-            files['main.js.gz']['path'],
-            os.path.join(
-                settings.BASE_DIR,
-                'assets/django_webpack_loader_bundles/main.js.gz'))
+        self.assertEqual(files['main.css']['path'], _MAIN_CSS)
+        self.assertEqual(files['main.js.gz']['path'], _MAIN_JS_GZ)
 
     def test_static_url(self):
         self.compile_bundles('webpack.config.publicPath.js')
@@ -133,48 +372,49 @@ class LoaderTestCase(TestCase):
         self.assertEquals(len(chunks), 1)
 
         files = assets['assets']
-        self.assertEqual(files['main.js']['path'], os.path.join(
-            settings.BASE_DIR, 'assets/django_webpack_loader_bundles/main.js'))
-        self.assertEqual(files['vendors.js']['path'], os.path.join(
-            settings.BASE_DIR,
-            'assets/django_webpack_loader_bundles/vendors.js'))
+        self.assertEqual(files['main.js']['path'], _MAIN_JS)
+        self.assertEqual(files['vendors.js']['path'], _VENDORS_JS)
 
     def test_templatetags(self):
-        self.compile_bundles('webpack.config.simple.js')
-        self.compile_bundles('webpack.config.app2.js')
+        self.compile_many(
+            ['webpack.config.simple.js', 'webpack.config.app2.js'])
         view = TemplateView.as_view(template_name='home.html')
-        request = self.factory.get('/')
+        request = self.get_request()
         result = view(request)
+        # rendered_content re-renders the template on every access, so
+        # grab it once per response.
+        content = result.rendered_content
         self.assertIn((
             '<link href="/static/django_webpack_loader_bundles/main.css" '
             'rel="stylesheet" />'),
-            result.rendered_content)
+            content)
         self.assertIn((
             '<script src="/static/django_webpack_loader_bundles/main.js" '
-            'async charset="UTF-8"></script>'), result.rendered_content)
+            'async charset="UTF-8"></script>'), content)
 
         self.assertIn((
             '<link href="/static/django_webpack_loader_bundles/app2.css" '
-            'rel="stylesheet" />'), result.rendered_content)
+            'rel="stylesheet" />'), content)
         self.assertIn((
             '<script src="/static/django_webpack_loader_bundles/app2.js" >'
-            '</script>'), result.rendered_content)
+            '</script>'), content)
         self.assertIn(
-            '<img src="/static/my-image.png"/>', result.rendered_content)
+            '<img src="/static/my-image.png"/>', content)
 
         view = TemplateView.as_view(template_name='only_files.html')
         result = view(request)
+        content = result.rendered_content
         self.assertIn((
             "var contentCss = "
             "'/static/django_webpack_loader_bundles/main.css'"),
-            result.rendered_content)
+            content)
         self.assertIn(
             "var contentJS = '/static/django_webpack_loader_bundles/main.js'",
-            result.rendered_content)
+            content)
 
         self.compile_bundles('webpack.config.publicPath.js')
         view = TemplateView.as_view(template_name='home.html')
-        request = self.factory.get('/')
+        request = self.get_request()
         result = view(request)
         self.assertIn(
             '<img src="http://custom-static-host.com/my-image.png"/>',
@@ -183,30 +423,31 @@ class LoaderTestCase(TestCase):
     def test_preload(self):
         self.compile_bundles('webpack.config.simple.js')
         view = TemplateView.as_view(template_name='preload.html')
-        request = self.factory.get('/')
+        request = self.get_request()
         result = view(request)
+        content = result.rendered_content
 
         # Preload
         self.assertIn((
             '<link href="/static/django_webpack_loader_bundles/main.css" '
-            'rel="preload" as="style" />'), result.rendered_content)
+            'rel="preload" as="style" />'), content)
         self.assertIn((
             '<link rel="preload" as="script" href="/static/'
             'django_webpack_loader_bundles/main.js" />'),
-            result.rendered_content)
+            content)
 
         # Resources
         self.assertIn((
             '<link href="/static/django_webpack_loader_bundles/main.css" '
-            'rel="stylesheet" />'), result.rendered_content)
+            'rel="stylesheet" />'), content)
         self.assertIn((
             '<script src="/static/django_webpack_loader_bundles/main.js" >'
-            '</script>'), result.rendered_content)
+            '</script>'), content)
 
     def test_append_extensions(self):
         self.compile_bundles('webpack.config.gzipTest.js')
         view = TemplateView.as_view(template_name='append_extensions.html')
-        request = self.factory.get('/')
+        request = self.get_request()
         result = view(request)
 
         self.assertIn((
@@ -214,8 +455,8 @@ class LoaderTestCase(TestCase):
             '</script>'), result.rendered_content)
 
     def test_jinja2(self):
-        self.compile_bundles('webpack.config.simple.js')
-        self.compile_bundles('webpack.config.app2.js')
+        self.compile_many(
+            ['webpack.config.simple.js', 'webpack.config.app2.js'])
         view = TemplateView.as_view(template_name='home.jinja')
 
         settings = {
@@ -226,19 +467,22 @@ class LoaderTestCase(TestCase):
                     'OPTIONS': {
                         'match_extension': '.jinja',
                         'extensions': DEFAULT_EXTENSIONS + [_OUR_EXTENSION],
+                        # Never evict compiled templates from the cache.
+                        'cache_size': -1,
                     }
                 },
             ]
         }
         with self.settings(**settings):
-            request = self.factory.get('/')
+            request = self.get_request()
             result = view(request)
+            content = result.rendered_content
             self.assertIn((
                 '<link href="/static/django_webpack_loader_bundles'
-                '/main.css" rel="stylesheet" />'), result.rendered_content)
+                '/main.css" rel="stylesheet" />'), content)
             self.assertIn((
                 '<script src="/static/django_webpack_loader_bundles/main.js" '
-                'async charset="UTF-8"></script>'), result.rendered_content)
+                'async charset="UTF-8"></script>'), content)
 
     def test_reporting_errors(self):
         self.compile_bundles('webpack.config.error.js')
@@ -274,8 +518,7 @@ class LoaderTestCase(TestCase):
     def test_timeouts(self):
         with self.settings(DEBUG=True):
             statsfile = settings.WEBPACK_LOADER[DEFAULT_CONFIG]['STATS_FILE']
-            with open(statsfile, 'w') as fd:
-                fd.write(json.dumps({'status': 'compile'}))
+            shutil.copyfile(_COMPILE_STATS_FIXTURE, statsfile)
             loader = get_loader(DEFAULT_CONFIG)
             loader.config['TIMEOUT'] = 0.1
             with self.assertRaises(WebpackLoaderTimeoutError):
@@ -283,8 +526,7 @@ class LoaderTestCase(TestCase):
 
     def test_bad_status_in_production(self):
         statsfile = settings.WEBPACK_LOADER[DEFAULT_CONFIG]['STATS_FILE']
-        with open(statsfile, 'w') as fd:
-            fd.write(json.dumps({'status': 'unexpected-status'}))
+        shutil.copyfile(_BAD_STATS_FIXTURE, statsfile)
 
         try:
             get_loader(DEFAULT_CONFIG).get_bundle('main')
@@ -296,38 +538,53 @@ class LoaderTestCase(TestCase):
             ), str(e))
 
     def test_request_blocking(self):
-        # FIXME: This will work 99% time but there is no guarantee with the
-        # 4 second thing. Need a better way to detect if request was blocked on
-        # not.
-        wait_for = 4
+        wait_for = 0.3
         view = TemplateView.as_view(template_name='home.html')
 
         with self.settings(DEBUG=True):
             statsfile = settings.WEBPACK_LOADER[DEFAULT_CONFIG]['STATS_FILE']
-            with open(statsfile, 'w') as fd:
-                fd.write(json.dumps({'status': 'compile'}))
-            then = time.time()
-            request = self.factory.get('/')
-            result = view(request)
-            t = Thread(
-                target=self.compile_bundles,
-                args=('webpack.config.simple.js', wait_for))
-            t2 = Thread(
-                target=self.compile_bundles,
-                args=('webpack.config.app2.js', wait_for))
-            t.start()
-            t2.start()
-            result.rendered_content
-            elapsed = time.time() - then
-            t.join()
-            t2.join()
-            self.assertTrue(elapsed >= wait_for)
+            shutil.copyfile(_COMPILE_STATS_FIXTURE, statsfile)
+            # Rendering blocks while the stats file says 'compile'; a
+            # background thread restores the 'done' stats once released,
+            # wait_for seconds after rendering starts. A generous TIMEOUT
+            # turns a failure in that thread into a
+            # WebpackLoaderTimeoutError instead of hanging the poll loop.
+            loader = get_loader(DEFAULT_CONFIG)
+            original_timeout = loader.config['TIMEOUT']
+            loader.config['TIMEOUT'] = 30
+            try:
+                release = Event()
+                errors = []
+
+                def release_bundles():
+                    release.wait()
+                    try:
+                        self.compile_many(
+                            ['webpack.config.simple.js',
+                             'webpack.config.app2.js'])
+                    except Exception as e:
+                        errors.append(e)
+
+                t = Thread(target=release_bundles)
+                t.start()
+                then = time.time()
+                request = self.get_request()
+                result = view(request)
+                Timer(wait_for, release.set).start()
+                result.rendered_content
+                elapsed = time.time() - then
+                t.join()
+                if errors:
+                    raise errors[0]
+                self.assertTrue(elapsed >= wait_for)
+            finally:
+                loader.config['TIMEOUT'] = original_timeout
 
         with self.settings(DEBUG=False):
-            self.compile_bundles('webpack.config.simple.js')
-            self.compile_bundles('webpack.config.app2.js')
+            self.compile_many(
+                ['webpack.config.simple.js', 'webpack.config.app2.js'])
             then = time.time()
-            request = self.factory.get('/')
+            request = self.get_request()
             result = view(request)
             result.rendered_content
             elapsed = time.time() - then
@@ -337,46 +594,27 @@ class LoaderTestCase(TestCase):
         """Test case for deduplication of modules with the django engine."""
         self.compile_bundles('webpack.config.skipCommon.js')
 
-        django_engine = engines['django']
-        dups_template = django_engine.from_string(template_code=(
-            r'{% load render_bundle from webpack_loader %}'
-            r'{% render_bundle "app1" %}'
-            r'{% render_bundle "app2" %}'))  # type: Template
-        request = self.factory.get(path='/')
-        asset_vendor = (
-            '<script src="/static/django_webpack_loader_bundles/vendors.js" >'
-            '</script>')
-        asset_app1 = (
-            '<script src="/static/django_webpack_loader_bundles/app1.js" >'
-            '</script>')
-        asset_app2 = (
-            '<script src="/static/django_webpack_loader_bundles/app2.js" >'
-            '</script>')
-        rendered_template = dups_template.render(
+        request = self.get_request()
+        rendered_template = self._dups_tmpl.render(
             context=None, request=request)
         used_tags = getattr(request, '_webpack_loader_used_tags', None)
 
         self.assertIsNotNone(used_tags, msg=(
             '_webpack_loader_used_tags should be a property of request!'))
-        self.assertEqual(rendered_template.count(asset_app1), 1)
-        self.assertEqual(rendered_template.count(asset_app2), 1)
-        self.assertEqual(rendered_template.count(asset_vendor), 2)
-
-        nodups_template = django_engine.from_string(template_code=(
-            r'{% load render_bundle from webpack_loader %}'
-            r'{% render_bundle "app1" %}'
-            r'{% render_bundle "app2" skip_common_chunks=True %}')
-        )  # type: Template
-        request = self.factory.get(path='/')
-        rendered_template = nodups_template.render(
+        self.assertEqual(rendered_template.count(_ASSET_APP1), 1)
+        self.assertEqual(rendered_template.count(_ASSET_APP2), 1)
+        self.assertEqual(rendered_template.count(_ASSET_VENDOR), 2)
+
+        request = self.get_request()
+        rendered_template = self._nodups_tmpl.render(
             context=None, request=request)
         used_tags = getattr(request, '_webpack_loader_used_tags', None)
 
         self.assertIsNotNone(used_tags, msg=(
             '_webpack_loader_used_tags should be a property of request!'))
-        self.assertEqual(rendered_template.count(asset_app1), 1)
-        self.assertEqual(rendered_template.count(asset_app2), 1)
-        self.assertEqual(rendered_template.count(asset_vendor), 1)
+        self.assertEqual(rendered_template.count(_ASSET_APP1), 1)
+        self.assertEqual(rendered_template.count(_ASSET_APP2), 1)
+        self.assertEqual(rendered_template.count(_ASSET_VENDOR), 1)
 
     def test_skip_common_chunks_jinja2engine(self):
         """Test case for deduplication of modules with the Jinja2 engine."""
@@ -391,30 +629,22 @@ class LoaderTestCase(TestCase):
                     'OPTIONS': {
                         'match_extension': '.jinja',
                         'extensions': DEFAULT_EXTENSIONS + [_OUR_EXTENSION],
+                        # Never evict compiled templates from the cache.
+                        'cache_size': -1,
                     }
                 },
             ]
         }
-        asset_vendor = (
-            '<script src="/static/django_webpack_loader_bundles/vendors.js" >'
-            '</script>')
-        asset_app1 = (
-            '<script src="/static/django_webpack_loader_bundles/app1.js" >'
-            '</script>')
-        asset_app2 = (
-            '<script src="/static/django_webpack_loader_bundles/app2.js" >'
-            '</script>')
-
         with self.settings(**settings):
-            request = self.factory.get('/')
+            request = self.get_request()
             result = view(request)  # type: TemplateResponse
             content = result.rendered_content
-        self.assertIn(asset_vendor, content)
-        self.assertIn(asset_app1, content)
-        self.assertIn(asset_app2, content)
-        self.assertEqual(content.count(asset_vendor), 1)
-        self.assertEqual(content.count(asset_app1), 1)
-        self.assertEqual(content.count(asset_app2), 1)
+        self.assertIn(_ASSET_VENDOR, content)
+        self.assertIn(_ASSET_APP1, content)
+        self.assertIn(_ASSET_APP2, content)
+        self.assertEqual(content.count(_ASSET_VENDOR), 1)
+        self.assertEqual(content.count(_ASSET_APP1), 1)
+        self.assertEqual(content.count(_ASSET_APP2), 1)
         used_tags = getattr(request, '_webpack_loader_used_tags', None)
         self.assertIsNotNone(used_tags, msg=(
             '_webpack_loader_used_tags should be a property of request!'))
@@ -3,6 +3,13 @@ import time
 import os
 from io import open
 
+try:
+    # orjson parses large stats files noticeably faster than the stdlib;
+    # it is optional and the stdlib is used when it is not installed.
+    import orjson
+except ImportError:
+    orjson = None
+
 from django.conf import settings
 from django.contrib.staticfiles.storage import staticfiles_storage
 
@@ -23,6 +30,9 @@ class WebpackLoader(object):
 
     def load_assets(self):
         try:
+            if orjson is not None:
+                with open(self.config['STATS_FILE'], 'rb') as f:
+                    return orjson.loads(f.read())
             with open(self.config['STATS_FILE'], encoding="utf-8") as f:
                 return json.load(f)
         except IOError: